@@ -3,19 +3,35 @@ from tkinter import Tk, filedialog, ttk, messagebox
 import tkinter as tk
 import openpyxl
 from openpyxl.styles import PatternFill
-import threading
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import os
 from PIL import Image, ImageTk # Pillow library for image handling
 import warnings # Import warnings module
 
-# Global variables
+# Global variables (inputs for the next merge job)
 file1_path_global = None
 file2_path_global = None
-save_path_global = None
-merged_df_global = None # This will store the DataFrame with 'Was_Updated' column
 file1_sheet_name_global = None
 file2_sheet_name_global = None
 
+# Merge job queue. Each job carries its own inputs, progress and result. Jobs run on a
+# bounded pool of worker processes, so several merges use separate cores at the same time.
+MAX_MERGE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+JOB_POLL_INTERVAL_MS = 200 # How often the GUI picks up worker progress and finished jobs
+CANCEL_CHECK_ROWS = 500 # Rows compared between cancellation checks (each check is a round trip to the manager)
+merge_executor = None # ProcessPoolExecutor, created in main() and rebuilt if a worker process dies
+job_manager = None # multiprocessing.Manager providing cross-process cancel events and the progress queue
+job_progress_queue = None # Workers put (job_id, status) here; drained on the Tk main loop
+merge_jobs = {} # job_id -> MergeJob, in submission order
+next_job_id = 1
+selected_job_id_global = None # Job whose result is shown in the preview and used for export
+user_selected_job_global = False # True once the user clicks a job; finished jobs then stop taking over the preview
+auto_select_iid_global = None # Row selected by the code itself, so on_job_selected doesn't count it as a user click
+exiting_global = False # Set once the user has chosen to exit; the window closes when no job is active
+
 # Global variables for icons
 schedule_icon = None
 roaster_icon = None
@@ -27,6 +43,47 @@ roaster_icon = None
 warnings.filterwarnings("ignore", category=UserWarning, module='openpyxl.worksheet._reader')
 
 
+# Job statuses
+JOB_QUEUED = "Queued"
+JOB_READING = "Reading files"
+JOB_MERGING = "Merging"
+JOB_SAVING = "Saving"
+JOB_COMPLETED = "Completed"
+JOB_FAILED = "Failed"
+JOB_CANCELLED = "Cancelled"
+JOB_FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+
+class MergeCancelled(Exception):
+    """Raised inside a worker when its merge job has been cancelled."""
+
+
+class MergeJob:
+    """A single queued merge with its own inputs, progress, result and cancellation flag."""
+
+    def __init__(self, job_id, file1_path, file1_sheet_name, file2_path, file2_sheet_name, save_path, cancel_event):
+        self.job_id = job_id
+        self.file1_path = file1_path
+        self.file1_sheet_name = file1_sheet_name
+        self.file2_path = file2_path
+        self.file2_sheet_name = file2_sheet_name
+        self.save_path = save_path
+        self.status = JOB_QUEUED
+        self.merged_df = None # DataFrame with 'Was_Updated' column once completed
+        self.error = None
+        self.cancel_event = cancel_event # job_manager.Event(), shared with the worker process
+        self.future = None
+        self.executor = None # Pool the job was submitted to, so a broken pool is only rebuilt once
+
+    def is_finished(self):
+        return self.status in JOB_FINISHED_STATUSES
+
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise MergeCancelled()
+
+
 def get_excel_sheet_names(file_path):
     """Returns a list of sheet names from an Excel file."""
     try:
@@ -239,151 +296,428 @@ def check_and_enable_merge_button():
                   foreground=[('disabled', 'gray'), ('!disabled', 'white')])
         status_label.config(text="Please select both files to continue", foreground="orange")
 
-def perform_merge_logic():
-    global save_path_global, merged_df_global
+def merge_dataframes(df1, df2, cancel_event=None):
+    """Merges the Scheduler (df1) VotedDate into the Roaster (df2) and flags updated rows in 'Was_Updated'."""
+    if 'NPI' not in df1.columns or 'VotedDate' not in df1.columns:
+        raise ValueError("Scheduler file must contain 'NPI' and 'VotedDate' columns.")
+    if 'Individual NPI' not in df2.columns or 'Provider Effective Date' not in df2.columns:
+        raise ValueError("Roaster file must contain 'Individual NPI' and 'Provider Effective Date' columns.")
 
-    window.after(0, lambda: status_label.config(text="Processing merge...", foreground="blue"))
-    window.after(0, lambda: merge_button.config(state=tk.DISABLED))
-    window.after(0, lambda: select_file1_button.config(state=tk.DISABLED))
-    window.after(0, lambda: select_file2_button.config(state=tk.DISABLED))
-    window.after(0, lambda: export_button.config(state=tk.DISABLED)) # Disable export during merge
-    window.after(0, lambda: exit_button.config(state=tk.DISABLED)) # Disable exit during merge
+    # Date conversion is done inside read_file_into_df, so no need here
 
-    try:
-        # Read files using the enhanced read_file_into_df
-        df1 = read_file_into_df(file1_path_global, file1_sheet_name_global)
-        df2 = read_file_into_df(file2_path_global, file2_sheet_name_global)
+    df2_original_dates = df2[['Individual NPI', 'Provider Effective Date']].copy()
+    
+    # Merge operation
+    merged = pd.merge(df2, df1[['NPI', 'VotedDate']], how='left', left_on='Individual NPI', right_on='NPI')
+    
+    # Track if Provider Effective Date was originally NaT or None before update
+    merged['Was_Originally_Empty'] = merged['Provider Effective Date'].isna()
 
-        # Column stripping is now done inside read_file_into_df
+    # Update 'Provider Effective Date' only if 'VotedDate' is not null
+    merged['Provider Effective Date'] = merged['VotedDate'].fillna(merged['Provider Effective Date'])
+    
+    # Determine if 'Provider Effective Date' was updated
+    merged['Was_Updated'] = False
+    for row_number, (idx, row) in enumerate(merged.iterrows()):
+        # Stop promptly if the job was cancelled while comparing rows
+        if row_number % CANCEL_CHECK_ROWS == 0:
+            check_cancelled(cancel_event)
+
+        orig_date_series = df2_original_dates[df2_original_dates['Individual NPI'] == row['Individual NPI']]['Provider Effective Date']
+        orig_date = orig_date_series.iloc[0] if not orig_date_series.empty else pd.NaT
+
+        if pd.notna(row['VotedDate']): # If there is a VotedDate
+            if pd.isna(orig_date): # If original Provider Effective Date was missing/NaT
+                merged.loc[idx, 'Was_Updated'] = True
+            else:
+                # Compare only the date part, ignore time, for floating point precision issues
+                # Now that dates are already .dt.date, direct comparison works as intended
+                if row['VotedDate'] != orig_date: 
+                    merged.loc[idx, 'Was_Updated'] = True
 
-        if 'NPI' not in df1.columns or 'VotedDate' not in df1.columns:
-            raise ValueError("Scheduler file must contain 'NPI' and 'VotedDate' columns.")
-        if 'Individual NPI' not in df2.columns or 'Provider Effective Date' not in df2.columns:
-            raise ValueError("Roaster file must contain 'Individual NPI' and 'Provider Effective Date' columns.")
+    return merged
 
-        # Date conversion is now done inside read_file_into_df, so no need here
+def save_merged_excel(merged_df, save_path):
+    """Writes the merged data to Excel and highlights updated 'Provider Effective Date' cells."""
+    # Prepare DataFrame for direct Excel export (without Was_Updated, NPI, VotedDate columns)
+    df_for_excel_output = merged_df.copy()
+    if 'Was_Updated' in df_for_excel_output.columns:
+        df_for_excel_output.drop(columns=['Was_Updated', 'NPI', 'VotedDate', 'Was_Originally_Empty'], inplace=True, errors='ignore')
 
-        df2_original_dates = df2[['Individual NPI', 'Provider Effective Date']].copy()
-        
-        # Merge operation
-        merged = pd.merge(df2, df1[['NPI', 'VotedDate']], how='left', left_on='Individual NPI', right_on='NPI')
-        
-        # Track if Provider Effective Date was originally NaT or None before update
-        merged['Was_Originally_Empty'] = merged['Provider Effective Date'].isna()
+    df_for_excel_output.to_excel(save_path, index=False)
 
-        # Update 'Provider Effective Date' only if 'VotedDate' is not null
-        merged['Provider Effective Date'] = merged['VotedDate'].fillna(merged['Provider Effective Date'])
-        
-        # Determine if 'Provider Effective Date' was updated
-        merged['Was_Updated'] = False
-        for idx, row in merged.iterrows():
-            orig_date_series = df2_original_dates[df2_original_dates['Individual NPI'] == row['Individual NPI']]['Provider Effective Date']
-            orig_date = orig_date_series.iloc[0] if not orig_date_series.empty else pd.NaT
-
-            if pd.notna(row['VotedDate']): # If there is a VotedDate
-                if pd.isna(orig_date): # If original Provider Effective Date was missing/NaT
-                    merged.loc[idx, 'Was_Updated'] = True
-                else:
-                    # Compare only the date part, ignore time, for floating point precision issues
-                    # Now that dates are already .dt.date, direct comparison works as intended
-                    if row['VotedDate'] != orig_date: 
-                        merged.loc[idx, 'Was_Updated'] = True
+    # Re-open the saved Excel file to apply conditional formatting
+    wb = openpyxl.load_workbook(save_path)
+    ws = wb.active
 
-        merged_df_global = merged.copy() 
+    provider_idx = None
+    for idx, cell in enumerate(ws[1], 1): # ws[1] is the first row (headers)
+        if cell.value == "Provider Effective Date":
+            provider_idx = idx
+            break
 
-        # Ask for save path for the Excel output
-        save_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            initialfile="Merged_Output.xlsx",
-            filetypes=[("Excel Files", "*.xlsx")]
-        )
-        if not save_path:
-            window.after(0, lambda: status_label.config(text="Merge cancelled", foreground="orange"))
-            reset_gui()
-            return
+    if provider_idx is None:
+        raise ValueError("Could not find 'Provider Effective Date' column in the output for coloring.")
 
-        save_path_global = save_path
+    fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+    
+    # Apply coloring based on the merged DataFrame which still has 'Was_Updated'
+    for df_idx, was_updated in enumerate(merged_df['Was_Updated']):
+        if was_updated:
+            excel_row = df_idx + 2 # +1 for 0-indexed to 1-indexed, +1 for header row
+            ws.cell(row=excel_row, column=provider_idx).fill = fill
         
-        # Prepare DataFrame for direct Excel export (without Was_Updated, NPI, VotedDate columns)
-        df_for_excel_output = merged_df_global.copy()
-        if 'Was_Updated' in df_for_excel_output.columns:
-            df_for_excel_output.drop(columns=['Was_Updated', 'NPI', 'VotedDate', 'Was_Originally_Empty'], inplace=True, errors='ignore')
+    wb.save(save_path)
 
-        df_for_excel_output.to_excel(save_path, index=False)
+def run_merge_job(job_id, file1_path, file1_sheet_name, file2_path, file2_sheet_name, save_path, cancel_event, progress_queue):
+    """Worker entry point: runs one merge job in a pool process and returns the merged DataFrame.
 
-        # Re-open the saved Excel file to apply conditional formatting
-        wb = openpyxl.load_workbook(save_path)
-        ws = wb.active
+    Runs outside the GUI process, so progress is only reported through progress_queue.
+    Raises MergeCancelled if cancel_event is set before saving starts.
+    """
+    check_cancelled(cancel_event)
 
-        provider_idx = None
-        for idx, cell in enumerate(ws[1], 1): # ws[1] is the first row (headers)
-            if cell.value == "Provider Effective Date":
-                provider_idx = idx
-                break
+    progress_queue.put((job_id, JOB_READING))
+    # Read files using the enhanced read_file_into_df (column stripping is done there)
+    df1 = read_file_into_df(file1_path, file1_sheet_name)
+    check_cancelled(cancel_event)
+    df2 = read_file_into_df(file2_path, file2_sheet_name)
+    check_cancelled(cancel_event)
 
-        if provider_idx is None:
-            raise ValueError("Could not find 'Provider Effective Date' column in the output for coloring.")
+    progress_queue.put((job_id, JOB_MERGING))
+    merged = merge_dataframes(df1, df2, cancel_event)
+    check_cancelled(cancel_event)
 
-        fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-        
-        # Apply coloring based on the original merged_df_global which still has 'Was_Updated'
-        for df_idx, was_updated in enumerate(merged_df_global['Was_Updated']):
-            if was_updated:
-                excel_row = df_idx + 2 # +1 for 0-indexed to 1-indexed, +1 for header row
-                ws.cell(row=excel_row, column=provider_idx).fill = fill
-            
-        wb.save(save_path)
+    # Once saving starts the output file is written in full, so cancellation is no longer honoured
+    progress_queue.put((job_id, JOB_SAVING))
+    save_merged_excel(merged, save_path)
 
-        window.after(0, lambda: status_label.config(
-            text=f"Merge completed successfully!\nSaved to: {os.path.basename(save_path_global)}", 
-            foreground="green"))
-        window.after(0, lambda: messagebox.showinfo(
-            "Success", 
-            f"File successfully saved at:\n{save_path_global}"))
-        window.after(0, show_preview)
-        window.after(0, lambda: export_button.config(state=tk.NORMAL)) # Enable export after successful merge
+    return merged
 
-    except Exception as e:
-        error_msg = str(e)
-        window.after(0, lambda: status_label.config(text=f"Error: {error_msg}", foreground="red"))
-        window.after(0, lambda: messagebox.showerror("Error", error_msg))
+def create_merge_executor():
+    return ProcessPoolExecutor(max_workers=MAX_MERGE_WORKERS)
+
+def rebuild_merge_executor():
+    """Replaces a pool that is broken because a worker process died (e.g. out of memory on a large roster)."""
+    global merge_executor
+
+    merge_executor.shutdown(wait=False, cancel_futures=True)
+    merge_executor = create_merge_executor()
+
+def poll_merge_jobs():
+    """Applies worker progress and finished jobs to the GUI, then re-schedules itself on the Tk main loop."""
+    try:
+        while True:
+            try:
+                job_id, status = job_progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            job = merge_jobs.get(job_id)
+            if job is not None and not job.is_finished():
+                job.status = status
+
+        broken_pool_jobs = []
+        for job in list(merge_jobs.values()):
+            if not job.is_finished() and job.future.done():
+                if finish_job(job):
+                    broken_pool_jobs.append(job)
+
+        refresh_jobs_view()
+
+        if broken_pool_jobs:
+            report_broken_pool(broken_pool_jobs)
     finally:
-        window.after(0, reset_gui)
-        window.after(0, lambda: exit_button.config(state=tk.NORMAL)) # Enable exit button after merge operation
+        # Always keep polling, even if updating the GUI for a job raised
+        if exiting_global and all(job.is_finished() for job in merge_jobs.values()):
+            window.destroy()
+        else:
+            window.after(JOB_POLL_INTERVAL_MS, poll_merge_jobs)
+
+def report_broken_pool(failed_jobs):
+    """Reports, once, every job lost when a worker process died, and starts a fresh pool for new jobs."""
+    if any(job.executor is merge_executor for job in failed_jobs):
+        rebuild_merge_executor()
+
+    job_ids = ", ".join(str(job.job_id) for job in failed_jobs)
+    status_label.config(text=f"A merge worker stopped unexpectedly. Failed job(s): {job_ids}", foreground="red")
+    if not exiting_global:
+        messagebox.showerror(
+            "Error",
+            f"A merge worker process stopped unexpectedly (for example, it ran out of memory).\n"
+            f"Failed job(s): {job_ids}\n\nNew merges can be queued again.")
+
+def finish_job(job):
+    """Records the outcome of a job whose future is done.
+
+    Returns True if the job was lost to a broken worker pool; those failures are reported
+    together by report_broken_pool instead of one dialog per job.
+    """
+    if job.future.cancelled():
+        job.status = JOB_CANCELLED
+        return False
+
+    error = job.future.exception()
+    if isinstance(error, BrokenProcessPool):
+        job.error = "The merge worker process stopped unexpectedly."
+        job.status = JOB_FAILED
+        return True
+    if isinstance(error, MergeCancelled):
+        job.status = JOB_CANCELLED
+        status_label.config(text=f"Job {job.job_id} cancelled", foreground="orange")
+    elif error is not None:
+        job.error = str(error)
+        job.status = JOB_FAILED
+        on_job_failed(job)
+    else:
+        job.merged_df = job.future.result()
+        job.status = JOB_COMPLETED
+        on_job_completed(job)
+    return False
+
+def on_job_completed(job):
+    global selected_job_id_global, auto_select_iid_global
+
+    # Completion is reported in the jobs table and status bar only, so a queue of merges
+    # doesn't stack one modal dialog per job (failures still get one, see on_job_failed)
+    status_label.config(
+        text=f"Job {job.job_id} completed successfully!\nSaved to: {job.save_path}",
+        foreground="green")
+
+    # Follow the latest result unless the user has picked another job to look at (or export).
+    # Changing the selection fires on_job_selected, which renders the preview.
+    if user_selected_job_global and selected_job_id_global != job.job_id:
+        return
+    selected_job_id_global = job.job_id
+    iid = str(job.job_id)
+    if jobs_tree.exists(iid) and jobs_tree.selection() != (iid,):
+        auto_select_iid_global = iid
+        jobs_tree.selection_set(iid)
+    else:
+        show_preview()
+        reset_gui()
+
+def on_job_failed(job):
+    status_label.config(text=f"Job {job.job_id} error: {job.error}", foreground="red")
+    messagebox.showerror("Error", f"Job {job.job_id} failed:\n{job.error}")
+
+def normalize_path(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
+
+def find_path_conflict(save_path, input_paths):
+    """Returns an error message if a new job's files clash with a queued or running job, else None.
+
+    A job may not write a file that another active job reads or writes, and may not read a file
+    that another active job is writing, since a worker could see it half-written.
+    """
+    save_path = normalize_path(save_path)
+    input_paths = [normalize_path(p) for p in input_paths]
+    for job in merge_jobs.values():
+        if job.is_finished():
+            continue
+        job_save_path = normalize_path(job.save_path)
+        if save_path == job_save_path:
+            return f"Job {job.job_id} is already saving to this file.\nPlease choose a different file name."
+        if save_path in (normalize_path(job.file1_path), normalize_path(job.file2_path)):
+            return f"Job {job.job_id} is reading this file as an input.\nPlease choose a different file name."
+        if job_save_path in input_paths:
+            return (f"Job {job.job_id} is still writing '{os.path.basename(job.save_path)}', "
+                    "which is selected as an input.\nWait for it to finish or choose a different input file.")
+    return None
+
+def queue_merge_job():
+    """Queues a merge job for the currently selected files; it runs when a pool worker is free."""
+    global next_job_id
+
+    if exiting_global:
+        return
+    if not (file1_path_global and file2_path_global):
+        check_and_enable_merge_button()
+        return
 
-def start_merge_thread():
-    threading.Thread(target=perform_merge_logic, daemon=True).start()
+    # Ask for the save path up front, on the main thread, so the job has all of its inputs
+    save_path = filedialog.asksaveasfilename(
+        defaultextension=".xlsx",
+        initialfile="Merged_Output.xlsx",
+        filetypes=[("Excel Files", "*.xlsx")]
+    )
+    if not save_path:
+        status_label.config(text="Merge cancelled", foreground="orange")
+        return
+
+    conflict = find_path_conflict(save_path, (file1_path_global, file2_path_global))
+    if conflict:
+        messagebox.showerror("Error", conflict)
+        return
+
+    job = MergeJob(next_job_id, file1_path_global, file1_sheet_name_global,
+                   file2_path_global, file2_sheet_name_global, save_path, job_manager.Event())
+    submit_args = (run_merge_job, job.job_id,
+                   job.file1_path, job.file1_sheet_name,
+                   job.file2_path, job.file2_sheet_name,
+                   job.save_path, job.cancel_event, job_progress_queue)
+
+    # Submit before registering the job, so a failed submit never leaves a job without a future
+    try:
+        job.future = merge_executor.submit(*submit_args)
+    except BrokenProcessPool:
+        # A worker died since the last poll; start a fresh pool and try once more
+        try:
+            rebuild_merge_executor()
+            job.future = merge_executor.submit(*submit_args)
+        except Exception as e:
+            status_label.config(text="Could not start merge job", foreground="red")
+            messagebox.showerror("Error", f"Could not start the merge job:\n{e}")
+            return
+    job.executor = merge_executor
+
+    next_job_id += 1
+    merge_jobs[job.job_id] = job
+
+    refresh_jobs_view()
+    status_label.config(text=f"Job {job.job_id} queued ({os.path.basename(job.file2_path)})", foreground="blue")
+
+def cancel_selected_job():
+    job = merge_jobs.get(selected_job_id_global)
+    if job is None or job.is_finished():
+        return
+
+    job.cancel_event.set()
+    if job.future is not None and job.future.cancel():
+        # Never started, so no worker will report back for it
+        job.status = JOB_CANCELLED
+        refresh_jobs_view()
+        status_label.config(text=f"Job {job.job_id} cancelled", foreground="orange")
+    elif job.status == JOB_SAVING:
+        status_label.config(text=f"Job {job.job_id} is already saving and will finish", foreground="orange")
+    else:
+        status_label.config(text=f"Cancelling job {job.job_id}...", foreground="orange")
+
+def refresh_jobs_view():
+    """Syncs the jobs table with merge_jobs. Runs on the Tk main loop only."""
+    for job in merge_jobs.values():
+        iid = str(job.job_id)
+        values = (job.job_id,
+                  os.path.basename(job.file1_path),
+                  os.path.basename(job.file2_path),
+                  job.status)
+        if jobs_tree.exists(iid):
+            jobs_tree.item(iid, values=values)
+        else:
+            jobs_tree.insert("", "end", iid=iid, values=values)
+    update_job_buttons()
+
+def update_job_buttons():
+    job = merge_jobs.get(selected_job_id_global)
+    if job is not None and not job.is_finished() and not exiting_global:
+        cancel_job_button.config(state=tk.NORMAL)
+    else:
+        cancel_job_button.config(state=tk.DISABLED)
+
+    if any(j.is_finished() for j in merge_jobs.values()) and not exiting_global:
+        clear_jobs_button.config(state=tk.NORMAL)
+    else:
+        clear_jobs_button.config(state=tk.DISABLED)
+
+def clear_finished_jobs():
+    """Drops finished jobs, with their merged results, from the queue and the jobs table."""
+    global selected_job_id_global, user_selected_job_global
+
+    finished_ids = [job_id for job_id, job in merge_jobs.items() if job.is_finished()]
+    for job_id in finished_ids:
+        del merge_jobs[job_id]
+        if jobs_tree.exists(str(job_id)):
+            jobs_tree.delete(str(job_id))
+
+    if selected_job_id_global in finished_ids:
+        selected_job_id_global = None
+        user_selected_job_global = False # Nothing picked any more, so follow new results again
+        show_preview() # Clears the preview of the removed job
+        reset_gui()
+    update_job_buttons()
+    status_label.config(text=f"Cleared {len(finished_ids)} finished job(s)", foreground="green")
+
+def on_job_selected(event=None):
+    global selected_job_id_global, user_selected_job_global, auto_select_iid_global
+
+    selection = jobs_tree.selection()
+    if not selection:
+        return
+    iid = selection[0]
+    if iid != auto_select_iid_global:
+        user_selected_job_global = True
+    auto_select_iid_global = None
+    selected_job_id_global = int(iid)
+    update_job_buttons()
+    show_preview()
+    reset_gui()
+
+def get_selected_merged_df():
+    """Returns the merged DataFrame of the selected job, or None if it has no result yet."""
+    job = merge_jobs.get(selected_job_id_global)
+    if job is None:
+        return None
+    return job.merged_df
+
+def exit_application():
+    global exiting_global
+
+    if exiting_global:
+        return # Already waiting for running jobs to stop
+
+    active_jobs = [j for j in merge_jobs.values() if not j.is_finished()]
+    if not active_jobs:
+        window.destroy()
+        return
+
+    if not messagebox.askyesno(
+            "Exit",
+            f"{len(active_jobs)} merge job(s) are still queued or running.\n"
+            "Cancel them and exit?\n\n"
+            "Running jobs stop after the file they are currently reading, and a job "
+            "that is already saving will finish writing its output first. "
+            "The window closes once they have stopped."):
+        return
+
+    exiting_global = True
+    for job in active_jobs:
+        job.cancel_event.set()
+        if job.future.cancel():
+            job.status = JOB_CANCELLED
+
+    # Keep the window up, without accepting new work, until poll_merge_jobs sees every job finished
+    for button in (select_file1_button, select_file2_button, merge_button, exit_button, cancel_job_button, clear_jobs_button):
+        button.config(state=tk.DISABLED)
+    running_count = sum(1 for j in active_jobs if not j.is_finished())
+    status_label.config(text=f"Stopping {running_count} running job(s) before exit...", foreground="orange")
+    refresh_jobs_view()
 
 def reset_gui():
-    merge_button.config(state=tk.DISABLED)
-    select_file1_button.config(state=tk.NORMAL)
-    select_file2_button.config(state=tk.NORMAL)
-    # The export button should be enabled only if there is merged data available
-    if merged_df_global is not None and not merged_df_global.empty:
+    # No new files can be picked once the application is waiting to exit
+    file_button_state = tk.DISABLED if exiting_global else tk.NORMAL
+    select_file1_button.config(state=file_button_state)
+    select_file2_button.config(state=file_button_state)
+    # The export button should be enabled only if the selected job has merged data available
+    merged_df = get_selected_merged_df()
+    if merged_df is not None and not merged_df.empty:
         export_button.config(state=tk.NORMAL)
     else:
         export_button.config(state=tk.DISABLED)
     
-    # Update button styles
-    check_and_enable_merge_button() # Re-apply merge button style
     style.map('TButton',
               background=[('disabled', 'lightgray'), ('!disabled', '#E1E1E1')],
               foreground=[('disabled', 'gray'), ('!disabled', 'black')]) # Default button style
 
-    if not (file1_path_global and file2_path_global):
-        status_label.config(text="Please select both files to continue", foreground="orange")
-
 def show_preview():
-    global merged_df_global
+    merged_df = get_selected_merged_df()
 
     for w in preview_frame.winfo_children():
         w.destroy()
 
-    if merged_df_global is None or merged_df_global.empty:
+    if merged_df is None or merged_df.empty:
         return
 
     # Create a copy to display in preview, dropping 'Was_Updated', 'NPI', 'VotedDate', 'Was_Originally_Empty'
-    df_for_preview = merged_df_global.copy()
+    df_for_preview = merged_df.copy()
     if 'Was_Updated' in df_for_preview.columns:
         df_for_preview.drop(columns=['Was_Updated', 'NPI', 'VotedDate', 'Was_Originally_Empty'], inplace=True, errors='ignore')
 
@@ -408,15 +742,15 @@ def show_preview():
         tree.heading(col, text=col)
         tree.column(col, width=150, anchor="center")
 
-    # Iterate through the original merged_df_global to get 'Was_Updated' status
+    # Iterate through the original merged_df to get 'Was_Updated' status
     # and then use df_for_preview's values for display
-    for i, row_orig in enumerate(merged_df_global.itertuples(index=False)):
+    for i, row_orig in enumerate(merged_df.itertuples(index=False)):
         values_for_display = tuple(df_for_preview.iloc[i]) # Get values from the clean df for display
         
         was_updated = False
-        if 'Was_Updated' in merged_df_global.columns:
+        if 'Was_Updated' in merged_df.columns:
             try:
-                was_updated_col_index = merged_df_global.columns.get_loc('Was_Updated')
+                was_updated_col_index = merged_df.columns.get_loc('Was_Updated')
                 was_updated = row_orig[was_updated_col_index]
             except IndexError:
                 pass 
@@ -425,13 +759,13 @@ def show_preview():
         tree.insert("", "end", values=values_for_display, tags=(tag,))
 
 def export_data(file_format):
-    global merged_df_global
-    if merged_df_global is None or merged_df_global.empty:
+    merged_df = get_selected_merged_df()
+    if merged_df is None or merged_df.empty:
         messagebox.showwarning("Export Warning", "No merged data available to export.")
         return
 
     # Prepare DataFrame for export: always remove internal 'NPI', 'VotedDate', 'Was_Originally_Empty' columns for final output
-    df_to_export_clean = merged_df_global.copy()
+    df_to_export_clean = merged_df.copy()
     df_to_export_clean.drop(columns=['NPI', 'VotedDate', 'Was_Originally_Empty'], inplace=True, errors='ignore')
 
     if file_format == "Excel":
@@ -453,7 +787,7 @@ def export_data(file_format):
 
     elif file_format == "CSV":
         # For CSV, add a new column to indicate if 'Provider Effective Date' was updated
-        df_for_csv_export = merged_df_global.copy()
+        df_for_csv_export = merged_df.copy()
         if 'Was_Updated' in df_for_csv_export.columns:
             # Map True/False to 'Yes'/'No' for better readability in CSV
             df_for_csv_export['Provider Effective Date Updated'] = df_for_csv_export['Was_Updated'].map({True: 'Yes', False: 'No'})
@@ -476,181 +810,240 @@ def export_data(file_format):
             except Exception as e:
                 messagebox.showerror("Export Error", f"Failed to export to CSV: {e}")
 
-# ------------- Professional GUI Design -------------
-window = tk.Tk()
-window.title("Excel Data Merger - Schedule & Roaster")
-window.state('zoomed') # Opens the window in maximized state by default
-window.configure(bg="#f0f0f0")
-
-# Load application icon (for taskbar/title bar)
-script_dir = os.path.dirname(__file__)
-app_icon_png_path = os.path.join(script_dir, 'Icons', 'app_icon.png') # Path to the PNG icon
+def main():
+    global window, style, schedule_icon, roaster_icon
+    global select_file1_button, select_file2_button, file1_status, file2_status
+    global merge_button, export_button, exit_button, status_label
+    global jobs_tree, cancel_job_button, clear_jobs_button, preview_frame
+    global merge_executor, job_manager, job_progress_queue
+
+    # Cancel events and progress are shared with the worker processes through a manager process
+    job_manager = multiprocessing.Manager()
+    job_progress_queue = job_manager.Queue()
+    merge_executor = create_merge_executor()
+
+    # ------------- Professional GUI Design -------------
+    window = tk.Tk()
+    window.title("Excel Data Merger - Schedule & Roaster")
+    window.state('zoomed') # Opens the window in maximized state by default
+    window.configure(bg="#f0f0f0")
+
+    # Load application icon (for taskbar/title bar)
+    script_dir = os.path.dirname(__file__)
+    app_icon_png_path = os.path.join(script_dir, 'Icons', 'app_icon.png') # Path to the PNG icon
+
+    if os.path.exists(app_icon_png_path):
+        try:
+            # Load the PNG image using PIL/Pillow
+            icon_image_raw = Image.open(app_icon_png_path)
+            icon_image = ImageTk.PhotoImage(icon_image_raw)
+            window.iconphoto(True, icon_image) # Set the icon for the window
+        except Exception as e:
+            messagebox.showwarning("Icon Error", f"Could not set application icon from PNG: {e}. Ensure '{os.path.basename(app_icon_png_path)}' is a valid PNG file.")
+    else:
+        messagebox.showwarning("Icon Warning", f"Application icon file '{os.path.basename(app_icon_png_path)}' not found. Taskbar icon may not appear.")
 
-if os.path.exists(app_icon_png_path):
+    # Load internal button icons
     try:
-        # Load the PNG image using PIL/Pillow
-        icon_image_raw = Image.open(app_icon_png_path)
-        icon_image = ImageTk.PhotoImage(icon_image_raw)
-        window.iconphoto(True, icon_image) # Set the icon for the window
+        schedule_icon_path = os.path.join(script_dir, 'Icons', 'scheduler_icon.png') 
+        roaster_icon_path = os.path.join(script_dir, 'Icons', 'roaster_icon.png')
+
+        schedule_icon_raw = Image.open(schedule_icon_path).resize((20, 20), Image.Resampling.LANCZOS)
+        schedule_icon = ImageTk.PhotoImage(schedule_icon_raw)
+
+        roaster_icon_raw = Image.open(roaster_icon_path).resize((20, 20), Image.Resampling.LANCZOS)
+        roaster_icon = ImageTk.PhotoImage(roaster_icon_raw)
+
+    except FileNotFoundError:
+        messagebox.showwarning("Icon Warning", "Could not load button icon files. Please ensure 'scheduler_icon.png' and 'roaster_icon.png' are in the 'Icons' subfolder next to the script.")
+        schedule_icon = None
+        roaster_icon = None
     except Exception as e:
-        messagebox.showwarning("Icon Error", f"Could not set application icon from PNG: {e}. Ensure '{os.path.basename(app_icon_png_path)}' is a valid PNG file.")
-else:
-    messagebox.showwarning("Icon Warning", f"Application icon file '{os.path.basename(app_icon_png_path)}' not found. Taskbar icon may not appear.")
-
-# Load internal button icons
-try:
-    schedule_icon_path = os.path.join(script_dir, 'Icons', 'scheduler_icon.png') 
-    roaster_icon_path = os.path.join(script_dir, 'Icons', 'roaster_icon.png')
-    
-    schedule_icon_raw = Image.open(schedule_icon_path).resize((20, 20), Image.Resampling.LANCZOS)
-    schedule_icon = ImageTk.PhotoImage(schedule_icon_raw)
-
-    roaster_icon_raw = Image.open(roaster_icon_path).resize((20, 20), Image.Resampling.LANCZOS)
-    roaster_icon = ImageTk.PhotoImage(roaster_icon_raw)
-
-except FileNotFoundError:
-    messagebox.showwarning("Icon Warning", "Could not load button icon files. Please ensure 'scheduler_icon.png' and 'roaster_icon.png' are in the 'Icons' subfolder next to the script.")
-    schedule_icon = None
-    roaster_icon = None
-except Exception as e:
-    messagebox.showwarning("Icon Error", f"Error loading button icons: {e}. Buttons will be text-only.")
-    schedule_icon = None
-    roaster_icon = None
-
-
-# Custom style for buttons
-style = ttk.Style()
-style.theme_use('clam')
-
-# Configure general ttk.Button style
-style.configure('TButton', font=('Segoe UI', 10), padding=10, relief="groove")
-style.map('TButton',
-          background=[('disabled', 'lightgray'), ('!disabled', '#E1E1E1')],
-          foreground=[('disabled', 'gray'), ('!disabled', 'black')])
-
-# Configure specific style for the Merge button
-style.configure('Merge.TButton', background="#4CAF50", foreground="white", font=('Segoe UI', 10, 'bold'), relief="groove")
-style.map('Merge.TButton',
-          background=[('disabled', 'lightgray'), ('!disabled', '#4CAF50')],
-          foreground=[('disabled', 'gray'), ('!disabled', 'white')])
-
-
-# Header
-header = tk.Frame(window, bg="#0078D7", height=60)
-header.pack(fill="x")
-
-title = tk.Label(header, 
-                 text="Excel Data Merger - Schedule & Roaster", 
-                 font=("Segoe UI", 16, "bold"), 
-                 bg="#0078D7", 
-                 fg="white")
-title.pack(pady=15)
-
-# Main content
-content = tk.Frame(window, bg="#f0f0f0")
-content.pack(expand=True, fill="both", padx=20, pady=10)
-
-# File selection panel
-file_panel = tk.LabelFrame(content, 
-                            text=" File Selection ",
-                            font=("Segoe UI", 11, "bold"),
-                            bg="#f0f0f0",
-                            padx=10,
-                            pady=10)
-file_panel.pack(fill="x", pady=(0, 15))
-
-# Frame for file selection buttons (left side of file_panel)
-file_selection_buttons_frame = tk.Frame(file_panel, bg="#f0f0f0")
-file_selection_buttons_frame.pack(side="left", fill="y", padx=(0, 20)) # Pack to the left
-
-# File 1 selection
-file1_frame = tk.Frame(file_selection_buttons_frame, bg="#f0f0f0")
-file1_frame.pack(fill="x", pady=5)
-
-select_file1_button = ttk.Button(file1_frame, 
-                                 text="Import Scheduler File",
-                                 command=lambda: select_file_and_sheet("Scheduler"),
-                                 compound="left", # Place icon to the left of text
-                                 image=schedule_icon,
-                                 width=20) # Increased width
-select_file1_button.pack(side="left", padx=(0, 10))
-
-file1_status = tk.Label(file1_frame, 
-                         text="No file selected", 
-                         bg="#f0f0f0", 
-                         font=("Segoe UI", 10))
-file1_status.pack(side="left")
-
-# File 2 selection
-file2_frame = tk.Frame(file_selection_buttons_frame, bg="#f0f0f0")
-file2_frame.pack(fill="x", pady=5)
-
-select_file2_button = ttk.Button(file2_frame, 
-                                 text="Import Roaster File",
-                                 command=lambda: select_file_and_sheet("Roaster"),
-                                 compound="left", # Place icon to the left of text
-                                 image=roaster_icon,
-                                 width=20) # Increased width
-select_file2_button.pack(side="left", padx=(0, 10))
-
-file2_status = tk.Label(file2_frame, 
-                         text="No file selected", 
-                         bg="#f0f0f0", 
-                         font=("Segoe UI", 10))
-file2_status.pack(side="left")
-
-# Action buttons - Moved to the right top corner of the file_panel
-# Create a frame to hold these buttons and pack it to the right
-action_buttons_frame = tk.Frame(file_panel, bg="#f0f0f0")
-action_buttons_frame.pack(side="right", fill="y", anchor="ne", padx=(0,10), pady=(0,10)) # Anchor top-right
-
-# Pack buttons from right to left within action_buttons_frame to achieve "Merge, Export, Exit" sequence from left to right on the GUI
-exit_button = ttk.Button(action_buttons_frame, 
-                         text="Exit", 
-                         command=window.destroy,
-                         width=10) # Adjusted width
-exit_button.pack(side="right", padx=(10, 0), pady=5) # Pack to the right
-
-export_button = ttk.Menubutton(action_buttons_frame, text="Export", state=tk.DISABLED, direction="below", width=15)
-export_button.pack(side="right", padx=(10, 0), pady=5) # Pack to the right
-
-export_menu = tk.Menu(export_button, tearoff=0)
-export_menu.add_command(label="Export to Excel", command=lambda: export_data("Excel"))
-export_menu.add_command(label="Export to CSV", command=lambda: export_data("CSV"))
-export_button["menu"] = export_menu
-
-merge_button = ttk.Button(action_buttons_frame, 
-                          text="Merge Files", 
-                          state=tk.DISABLED,
-                          command=start_merge_thread,
-                          style='Merge.TButton',
-                          width=15) # Adjusted width
-merge_button.pack(side="right", padx=(10, 0), pady=5) # Pack to the right
-
-# Status bar (remains below the file_panel)
-status_frame = tk.Frame(content, bg="#f0f0f0")
-status_frame.pack(fill="x", pady=(0, 15))
-
-status_label = tk.Label(status_frame, 
-                         text="Please select both files to continue", 
-                         bg="#f0f0f0", 
-                         font=("Segoe UI", 10),
-                         fg="orange")
-status_label.pack()
-
-# Preview panel
-preview_panel = tk.LabelFrame(content, 
-                               text=" Merged Data Preview ",
-                               font=("Segoe UI", 11, "bold"),
-                               bg="#f0f0f0",
-                               padx=10,
-                               pady=10)
-preview_panel.pack(expand=True, fill="both")
-
-preview_frame = tk.Frame(preview_panel, bg="#f0f0f0")
-preview_frame.pack(expand=True, fill="both", padx=5, pady=5)
-
-# Initial check to set button states
-check_and_enable_merge_button()
-
-window.mainloop()
+        messagebox.showwarning("Icon Error", f"Error loading button icons: {e}. Buttons will be text-only.")
+        schedule_icon = None
+        roaster_icon = None
+
+
+    # Custom style for buttons
+    style = ttk.Style()
+    style.theme_use('clam')
+
+    # Configure general ttk.Button style
+    style.configure('TButton', font=('Segoe UI', 10), padding=10, relief="groove")
+    style.map('TButton',
+              background=[('disabled', 'lightgray'), ('!disabled', '#E1E1E1')],
+              foreground=[('disabled', 'gray'), ('!disabled', 'black')])
+
+    # Configure specific style for the Merge button
+    style.configure('Merge.TButton', background="#4CAF50", foreground="white", font=('Segoe UI', 10, 'bold'), relief="groove")
+    style.map('Merge.TButton',
+              background=[('disabled', 'lightgray'), ('!disabled', '#4CAF50')],
+              foreground=[('disabled', 'gray'), ('!disabled', 'white')])
+
+
+    # Header
+    header = tk.Frame(window, bg="#0078D7", height=60)
+    header.pack(fill="x")
+
+    title = tk.Label(header, 
+                     text="Excel Data Merger - Schedule & Roaster", 
+                     font=("Segoe UI", 16, "bold"), 
+                     bg="#0078D7", 
+                     fg="white")
+    title.pack(pady=15)
+
+    # Main content
+    content = tk.Frame(window, bg="#f0f0f0")
+    content.pack(expand=True, fill="both", padx=20, pady=10)
+
+    # File selection panel
+    file_panel = tk.LabelFrame(content, 
+                                text=" File Selection ",
+                                font=("Segoe UI", 11, "bold"),
+                                bg="#f0f0f0",
+                                padx=10,
+                                pady=10)
+    file_panel.pack(fill="x", pady=(0, 15))
+
+    # Frame for file selection buttons (left side of file_panel)
+    file_selection_buttons_frame = tk.Frame(file_panel, bg="#f0f0f0")
+    file_selection_buttons_frame.pack(side="left", fill="y", padx=(0, 20)) # Pack to the left
+
+    # File 1 selection
+    file1_frame = tk.Frame(file_selection_buttons_frame, bg="#f0f0f0")
+    file1_frame.pack(fill="x", pady=5)
+
+    select_file1_button = ttk.Button(file1_frame, 
+                                     text="Import Scheduler File",
+                                     command=lambda: select_file_and_sheet("Scheduler"),
+                                     compound="left", # Place icon to the left of text
+                                     image=schedule_icon,
+                                     width=20) # Increased width
+    select_file1_button.pack(side="left", padx=(0, 10))
+
+    file1_status = tk.Label(file1_frame, 
+                             text="No file selected", 
+                             bg="#f0f0f0", 
+                             font=("Segoe UI", 10))
+    file1_status.pack(side="left")
+
+    # File 2 selection
+    file2_frame = tk.Frame(file_selection_buttons_frame, bg="#f0f0f0")
+    file2_frame.pack(fill="x", pady=5)
+
+    select_file2_button = ttk.Button(file2_frame, 
+                                     text="Import Roaster File",
+                                     command=lambda: select_file_and_sheet("Roaster"),
+                                     compound="left", # Place icon to the left of text
+                                     image=roaster_icon,
+                                     width=20) # Increased width
+    select_file2_button.pack(side="left", padx=(0, 10))
+
+    file2_status = tk.Label(file2_frame, 
+                             text="No file selected", 
+                             bg="#f0f0f0", 
+                             font=("Segoe UI", 10))
+    file2_status.pack(side="left")
+
+    # Action buttons - Moved to the right top corner of the file_panel
+    # Create a frame to hold these buttons and pack it to the right
+    action_buttons_frame = tk.Frame(file_panel, bg="#f0f0f0")
+    action_buttons_frame.pack(side="right", fill="y", anchor="ne", padx=(0,10), pady=(0,10)) # Anchor top-right
+
+    # Pack buttons from right to left within action_buttons_frame to achieve "Merge, Export, Exit" sequence from left to right on the GUI
+    exit_button = ttk.Button(action_buttons_frame, 
+                             text="Exit", 
+                             command=exit_application,
+                             width=10) # Adjusted width
+    exit_button.pack(side="right", padx=(10, 0), pady=5) # Pack to the right
+
+    export_button = ttk.Menubutton(action_buttons_frame, text="Export", state=tk.DISABLED, direction="below", width=15)
+    export_button.pack(side="right", padx=(10, 0), pady=5) # Pack to the right
+
+    export_menu = tk.Menu(export_button, tearoff=0)
+    export_menu.add_command(label="Export to Excel", command=lambda: export_data("Excel"))
+    export_menu.add_command(label="Export to CSV", command=lambda: export_data("CSV"))
+    export_button["menu"] = export_menu
+
+    merge_button = ttk.Button(action_buttons_frame, 
+                              text="Merge Files", 
+                              state=tk.DISABLED,
+                              command=queue_merge_job,
+                              style='Merge.TButton',
+                              width=15) # Adjusted width
+    merge_button.pack(side="right", padx=(10, 0), pady=5) # Pack to the right
+
+    # Status bar (remains below the file_panel)
+    status_frame = tk.Frame(content, bg="#f0f0f0")
+    status_frame.pack(fill="x", pady=(0, 15))
+
+    status_label = tk.Label(status_frame, 
+                             text="Please select both files to continue", 
+                             bg="#f0f0f0", 
+                             font=("Segoe UI", 10),
+                             fg="orange")
+    status_label.pack()
+
+    # Merge jobs panel
+    jobs_panel = tk.LabelFrame(content, 
+                                text=" Merge Jobs ",
+                                font=("Segoe UI", 11, "bold"),
+                                bg="#f0f0f0",
+                                padx=10,
+                                pady=10)
+    jobs_panel.pack(fill="x", pady=(0, 15))
+
+    cancel_job_button = ttk.Button(jobs_panel, 
+                                   text="Cancel Job", 
+                                   state=tk.DISABLED,
+                                   command=cancel_selected_job,
+                                   width=15)
+    cancel_job_button.pack(side="right", anchor="ne", padx=(10, 0))
+
+    clear_jobs_button = ttk.Button(jobs_panel, 
+                                   text="Clear Finished", 
+                                   state=tk.DISABLED,
+                                   command=clear_finished_jobs,
+                                   width=15)
+    clear_jobs_button.pack(side="right", anchor="ne", padx=(10, 0))
+
+    jobs_columns = ("Job", "Scheduler File", "Roaster File", "Status")
+    jobs_tree = ttk.Treeview(jobs_panel, columns=jobs_columns, show="headings", height=4, selectmode="browse")
+    jobs_vsb = ttk.Scrollbar(jobs_panel, orient="vertical", command=jobs_tree.yview)
+    jobs_tree.configure(yscrollcommand=jobs_vsb.set)
+    jobs_vsb.pack(side="right", fill="y")
+    jobs_tree.pack(expand=True, fill="x")
+
+    for col in jobs_columns:
+        jobs_tree.heading(col, text=col)
+        jobs_tree.column(col, width=60 if col == "Job" else 250, anchor="center")
+
+    jobs_tree.bind("<<TreeviewSelect>>", on_job_selected)
+
+    # Preview panel
+    preview_panel = tk.LabelFrame(content, 
+                                   text=" Merged Data Preview ",
+                                   font=("Segoe UI", 11, "bold"),
+                                   bg="#f0f0f0",
+                                   padx=10,
+                                   pady=10)
+    preview_panel.pack(expand=True, fill="both")
+
+    preview_frame = tk.Frame(preview_panel, bg="#f0f0f0")
+    preview_frame.pack(expand=True, fill="both", padx=5, pady=5)
+
+    # Initial check to set button states
+    check_and_enable_merge_button()
+
+    window.protocol("WM_DELETE_WINDOW", exit_application) # Cancel queued jobs when the window is closed
+    window.after(JOB_POLL_INTERVAL_MS, poll_merge_jobs)
+    window.mainloop()
+
+    # Window closed: let the worker processes wind down, then stop the manager they report through
+    merge_executor.shutdown(wait=True, cancel_futures=True)
+    job_manager.shutdown()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Needed for the worker processes in the PyInstaller build
+    main()